@@ -2,17 +2,38 @@
 Flask web application for the Prompt Evaluation Dashboard.
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
 from pathlib import Path
 import sys
 import os
+import json
+import threading
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
+# Load .env before anything reads the environment
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
 from runner import EvaluationRunner
 from leaderboard import Leaderboard
 
@@ -25,6 +46,57 @@ except ImportError:
 
 app = Flask(__name__)
 
+# Shared for the process lifetime instead of being rebuilt on every request
+evaluation_runner = EvaluationRunner()
+leaderboard = Leaderboard()
+
+# Flask's threaded server may run several evaluations at once
+evaluation_lock = threading.Lock()
+
+# Optional Redis cache so leaderboard data is shared across workers and restarts
+LEADERBOARD_CACHE_KEY = "leaderboard:v1"
+LEADERBOARD_CACHE_TTL = int(os.getenv('LEADERBOARD_CACHE_TTL', '60'))
+
+redis_url = os.getenv('REDIS_URL')
+if redis_url and REDIS_AVAILABLE:
+    redis_client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(redis_url))
+else:
+    redis_client = None
+
+
+def get_cached_leaderboard_data():
+    """Return leaderboard data from Redis, computing and storing it on a miss."""
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(LEADERBOARD_CACHE_KEY)
+            if cached is not None:
+                return json.loads(cached)
+        except redis.RedisError as e:
+            print(f"Redis unavailable, reading leaderboard from disk: {e}")
+    
+    leaderboard_data = leaderboard.get_leaderboard_data()
+    
+    if redis_client is not None:
+        try:
+            redis_client.setex(
+                LEADERBOARD_CACHE_KEY, LEADERBOARD_CACHE_TTL, json.dumps(leaderboard_data)
+            )
+        except redis.RedisError as e:
+            print(f"Failed to cache leaderboard in Redis: {e}")
+    
+    return leaderboard_data
+
+
+def invalidate_leaderboard_cache():
+    """Drop the shared leaderboard entry so the next read recomputes it."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(LEADERBOARD_CACHE_KEY)
+    except redis.RedisError as e:
+        print(f"Failed to invalidate leaderboard cache: {e}")
+
+
 # Configure CORS (adjust origins for production)
 CORS(app, resources={
     r"/api/*": {
@@ -34,27 +106,53 @@ CORS(app, resources={
     }
 })
 
-# Configure rate limiting
+# Configure rate limiting; limits are shared across workers when Redis is configured
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=redis_url if redis_url and REDIS_AVAILABLE else "memory://"
 )
 
 
+def ojsonify(data):
+    """Build a JSON response, serializing with orjson when it is installed."""
+    if not ORJSON_AVAILABLE:
+        return jsonify(data)
+    return Response(
+        orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype="application/json"
+    )
+
+
 @app.route('/')
 def index():
     """Serve the main dashboard."""
     return render_template('index.html')
 
 
+# Prompt listing, rebuilt only when the prompts/ directory changes
+_prompts_cache = {"mtime": None, "list": []}
+
+
 @app.route('/api/prompts')
 def get_prompts():
     """Get list of available prompts."""
-    prompts_dir = Path('prompts')
-    prompts = [f.name for f in prompts_dir.glob('*.txt')]
-    return jsonify(prompts)
+    try:
+        mtime = os.stat('prompts').st_mtime_ns
+    except FileNotFoundError:
+        return ojsonify([])
+    
+    if mtime != _prompts_cache["mtime"]:
+        # Only names are needed, so skip building a Path per glob match
+        with os.scandir('prompts') as entries:
+            prompts = [
+                entry.name for entry in entries
+                if entry.name.endswith('.txt') and entry.is_file()
+            ]
+        _prompts_cache.update(mtime=mtime, list=prompts)
+    
+    return ojsonify(_prompts_cache["list"])
 
 
 @app.route('/api/evaluate', methods=['POST'])
@@ -68,14 +166,14 @@ def run_evaluation():
     
     try:
         # Run evaluation
-        runner = EvaluationRunner()
-        runner.run_evaluation(prompt_names=selected_prompts)
+        with evaluation_lock:
+            evaluation_runner.run_evaluation(prompt_names=selected_prompts)
+        invalidate_leaderboard_cache()
         
         # Get leaderboard
-        leaderboard = Leaderboard()
-        leaderboard_data = leaderboard.get_leaderboard_data()
+        leaderboard_data = get_cached_leaderboard_data()
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "leaderboard": leaderboard_data
         })
@@ -88,9 +186,8 @@ def run_evaluation():
 def get_leaderboard():
     """Get current leaderboard data."""
     try:
-        leaderboard = Leaderboard()
-        leaderboard_data = leaderboard.get_leaderboard_data()
-        return jsonify(leaderboard_data)
+        leaderboard_data = get_cached_leaderboard_data()
+        return ojsonify(leaderboard_data)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -7,59 +7,77 @@ This demonstrates the platform using built-in Python only.
 
 import json
 import re
+import zlib
+from itertools import repeat
+from operator import itemgetter
 from pathlib import Path
 
 
+def _popcount(x):
+    """Count set bits in a non-negative integer."""
+    return bin(x).count("1")
+
+
+def _word_bits(text):
+    """Map each lowercase word of text onto one bit of a 1024-bit set."""
+    bits = 0
+    for word in text.lower().split():
+        bits |= 1 << (zlib.crc32(word.encode("utf-8")) & 1023)
+    return bits
+
+
 def simple_similarity(text1, text2):
     """Calculate basic word overlap similarity."""
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
+    bits1 = _word_bits(text1)
+    bits2 = _word_bits(text2)
     
-    if not words1 or not words2:
+    if not bits1 or not bits2:
         return 0.0
     
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
-    
-    return len(intersection) / len(union) if union else 0.0
+    # Jaccard over hashed word sets; rare bucket collisions are acceptable here
+    return _popcount(bits1 & bits2) / _popcount(bits1 | bits2)
+
+
+# Predefined answers
+ANSWERS = {
+    "capital of france": "Paris",
+    "romeo and juliet": "William Shakespeare",
+    "chemical symbol for gold": "Au",
+    "first moon landing": "1969",
+    "largest planet": "Jupiter",
+    "speed of light": "approximately 299,792,458 meters per second",
+    "mona lisa": "Leonardo da Vinci"
+}
+
+# Overall score weights for the leaderboard
+SCORE_WEIGHTS = (0.3, 0.4, 0.2, 0.1)
+get_weighted_scores = itemgetter(
+    "semantic_similarity_mean", "accuracy_mean", "faithfulness_mean", "completeness_mean"
+)
+
+# Single-pass matchers built once at import time
+ANSWER_PATTERN = re.compile("|".join(re.escape(key) for key in ANSWERS))
+QUALITY_PATTERN = re.compile(r"step|think|accurate|precise|###|\*\*")
 
 
 def mock_llm_response(prompt, question, context):
     """Generate mock responses based on prompt analysis."""
     # Analyze prompt quality
     quality_score = 0
-    prompt_lower = prompt.lower()
+    found = set(QUALITY_PATTERN.findall(prompt.lower()))
     
-    if "step" in prompt_lower or "think" in prompt_lower:
+    if "step" in found or "think" in found:
         quality_score += 2
-    if "accurate" in prompt_lower or "precise" in prompt_lower:
+    if "accurate" in found or "precise" in found:
         quality_score += 1
     if len(prompt) > 150:
         quality_score += 1
-    if "###" in prompt or "**" in prompt:
+    if "###" in found or "**" in found:
         quality_score += 2
     
-    # Predefined answers
-    answers = {
-        "capital of france": "Paris",
-        "romeo and juliet": "William Shakespeare",
-        "chemical symbol for gold": "Au",
-        "first moon landing": "1969",
-        "largest planet": "Jupiter",
-        "speed of light": "approximately 299,792,458 meters per second",
-        "mona lisa": "Leonardo da Vinci"
-    }
-    
     # Find answer
-    q_lower = question.lower()
-    answer = None
-    for key, value in answers.items():
-        if key in q_lower:
-            answer = value
-            break
-    
-    if not answer:
-        answer = "Demo answer"
+    match = ANSWER_PATTERN.search(question.lower())
+    answer = ANSWERS[match.group(0)] if match else "Demo answer"
     
     # Vary detail based on prompt quality
     if quality_score >= 4:
@@ -100,6 +118,16 @@ def evaluate_output(output, reference):
     }
 
 
+def score_case(prompt_template, test_case):
+    """Generate and evaluate the response for one test case."""
+    question = test_case["question"]
+    reference = test_case["reference_answer"]
+    context = test_case.get("context", "")
+    
+    output = mock_llm_response(prompt_template, question, context)
+    return output, evaluate_output(output, reference)
+
+
 def run_demo():
     """Run the demo evaluation."""
     print("\n" + "="*70)
@@ -127,19 +155,15 @@ def run_demo():
         with open(prompt_file, 'r', encoding='utf-8') as f:
             prompt_template = f.read()
         
+        # Scoring a handful of cases takes microseconds, far less than starting
+        # worker processes, so the demo scores them in-process
+        test_cases = dataset[:5]  # First 5 for demo
+        case_results = list(map(score_case, repeat(prompt_template), test_cases))
+        
         scores_list = []
         
-        for idx, test_case in enumerate(dataset[:5], 1):  # First 5 for demo
+        for idx, (test_case, (output, scores)) in enumerate(zip(test_cases, case_results), 1):
             question = test_case["question"]
-            reference = test_case["reference_answer"]
-            context = test_case.get("context", "")
-            
-            # Generate response
-            full_prompt = prompt_template.replace("{question}", question).replace("{context}", context)
-            output = mock_llm_response(prompt_template, question, context)
-            
-            # Evaluate
-            scores = evaluate_output(output, reference)
             scores_list.append(scores)
             
             print(f"Test {idx}: {question[:50]}...")
@@ -152,12 +176,7 @@ def run_demo():
             avg_scores[f"{key}_mean"] = sum(s[key] for s in scores_list) / len(scores_list)
         
         # Calculate overall score
-        overall = (
-            avg_scores.get("semantic_similarity_mean", 0) * 0.3 +
-            avg_scores.get("accuracy_mean", 0) * 0.4 +
-            avg_scores.get("faithfulness_mean", 0) * 0.2 +
-            avg_scores.get("completeness_mean", 0) * 0.1
-        )
+        overall = sum(w * v for w, v in zip(SCORE_WEIGHTS, get_weighted_scores(avg_scores)))
         
         all_results.append({
             "prompt_name": prompt_file.name,
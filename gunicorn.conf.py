@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for production deployments.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('FLASK_PORT', '5000')}"
+# One worker by default: the evaluation lock and the results file writer are
+# per-process, so several workers could run evaluations into scores.ndjson at once
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+
+# Cooperative workers: evaluations are I/O-bound on OpenAI calls. Use gevent
+# rather than Flask async views, which need asgiref and do not pool connections.
+worker_class = "gevent"
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Evaluation runs can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
@@ -4,19 +4,87 @@ Detects hallucinations and checks factual consistency.
 """
 
 import os
-from typing import Dict, Optional
+import asyncio
+import hashlib
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-try:
-    from dotenv import load_dotenv
+from response_cache import ResponseCache
+from rate_limiter import RateLimiter, call_with_retry, estimate_tokens
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+# openai (with pydantic and httpx) is slow to import, so it is only probed here
+# and imported where a client is actually built; demo mode never pays for it
+OPENAI_AVAILABLE = find_spec("openai") is not None
+# h2 enables HTTP/2 in httpx
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+_env_loaded = False
+
+
+def load_env_file() -> None:
+    """Load .env into the environment once, unless LOAD_DOTENV is set to something other than 1."""
+    global _env_loaded
+    if _env_loaded or os.environ.get("LOAD_DOTENV", "1") != "1":
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return  # Running without dotenv in demo mode
     load_dotenv()
-except ImportError:
-    pass  # Running without dotenv in demo mode
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+
+# Pooled clients shared by every evaluator in the process, keyed by API key
+_SHARED_CLIENTS: Dict[str, "OpenAI"] = {}
+
+
+def _get_shared_client(api_key: str) -> "OpenAI":
+    """Return a process-wide OpenAI client with keep-alive connection pooling."""
+    client = _SHARED_CLIENTS.get(api_key)
+    if client is None:
+        import httpx
+        from openai import OpenAI
+        
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+        client = OpenAI(api_key=api_key, http_client=http_client)
+        _SHARED_CLIENTS[api_key] = client
+    return client
+
+
+def make_async_http_client(max_connections: int = 64) -> "httpx.AsyncClient":
+    """
+    Create a pooled async HTTP client for AsyncOpenAI.
+    
+    Concurrent requests are multiplexed over one HTTP/2 connection when h2 is
+    installed; otherwise they share a pool of HTTP/1.1 keep-alive connections.
+    
+    Args:
+        max_connections: Upper bound on open (and keep-alive) connections
+        
+    Returns:
+        httpx.AsyncClient; the caller is responsible for closing it
+    """
+    import httpx
+    
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+    )
+
+
+JUDGE_SYSTEM_PROMPT = (
+    "You are an expert evaluator assessing the quality of AI-generated answers. "
+    "Provide numerical scores between 0 and 1."
+)
 
 
 class LLMEvaluator:
@@ -30,11 +98,14 @@ class LLMEvaluator:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             judge_model: Model to use as judge (default: gpt-4)
         """
+        load_env_file()
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.judge_model = judge_model
+        # Judge verdicts keyed by the graded inputs; only successful API calls are stored
+        self.judge_cache = ResponseCache()
         
         if self.api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = _get_shared_client(self.api_key)
         else:
             self.client = None
             # Demo mode - uses heuristic scoring
@@ -70,16 +141,7 @@ class LLMEvaluator:
         try:
             response = self.client.chat.completions.create(
                 model=self.judge_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert evaluator assessing the quality of AI-generated answers. Provide numerical scores between 0 and 1."
-                    },
-                    {
-                        "role": "user",
-                        "content": eval_prompt
-                    }
-                ],
+                messages=self._build_judge_messages(eval_prompt),
                 temperature=0.0
             )
             
@@ -96,6 +158,92 @@ class LLMEvaluator:
                 "completeness": 0.5
             }
     
+    async def aevaluate_response(
+        self,
+        question: str,
+        model_output: str,
+        reference_answer: str,
+        context: Optional[str] = None,
+        client: Optional["AsyncOpenAI"] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ) -> Dict[str, float]:
+        """
+        Async variant of evaluate_response for use inside an event loop.
+        
+        Judge calls are paced by rate_limiter and rate-limited (429) calls are
+        retried, so quota errors do not turn into default scores.
+        
+        Args:
+            question: The input question
+            model_output: The model's generated answer
+            reference_answer: The expected correct answer
+            context: Optional context provided to the model
+            client: AsyncOpenAI client bound to the running loop; without one the
+                synchronous pooled client is used from a worker thread
+            rate_limiter: Limiter shared with the caller's other requests
+                (default: no client-side limit, server rate-limit headers still apply)
+            
+        Returns:
+            Dictionary with scores for accuracy, faithfulness, and completeness
+        """
+        if not self.client:
+            # Return heuristic-based mock scores if no API key
+            return self._mock_evaluate(model_output, reference_answer, question)
+        
+        if client is None:
+            return await asyncio.to_thread(
+                self.evaluate_response, question, model_output, reference_answer, context
+            )
+        
+        namespace = self._judge_namespace(question, reference_answer, context)
+        cached = self.judge_cache.get(namespace, model_output)
+        if cached is not None:
+            return dict(cached)
+        
+        eval_prompt = self._build_evaluation_prompt(
+            question, model_output, reference_answer, context
+        )
+        
+        try:
+            response = await call_with_retry(
+                rate_limiter or RateLimiter(),
+                lambda: client.chat.completions.with_raw_response.create(
+                    model=self.judge_model,
+                    messages=self._build_judge_messages(eval_prompt),
+                    temperature=0.0
+                ),
+                estimate_tokens(eval_prompt)
+            )
+            scores = self._parse_scores(response.choices[0].message.content)
+            self.judge_cache.put(namespace, model_output, scores)
+            return dict(scores)
+        
+        except Exception as e:
+            print(f"Error during LLM evaluation: {e}")
+            # Return default scores on error
+            return {
+                "accuracy": 0.5,
+                "faithfulness": 0.5,
+                "completeness": 0.5
+            }
+    
+    def _judge_namespace(
+        self,
+        question: str,
+        reference_answer: str,
+        context: Optional[str]
+    ) -> str:
+        """Hash everything the judge sees besides the model output into a cache namespace."""
+        key = "\0".join((self.judge_model, question, reference_answer, context or ""))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _build_judge_messages(self, eval_prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the judge model."""
+        return [
+            {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+            {"role": "user", "content": eval_prompt}
+        ]
+    
     def _build_evaluation_prompt(
         self,
         question: str,
@@ -136,8 +284,11 @@ Completeness: [score]
         Generate mock evaluation scores using heuristics.
         Analyzes output quality without requiring API access.
         """
-        import random
-        random.seed(hash(output + reference) % 10000)  # Consistent scores for same input
+        # Deterministic jitter from hash bits: consistent scores for same input
+        h = hash((output, reference))
+        jitter_accuracy = ((h & 0xFF) / 255.0 - 0.5) * 0.1
+        jitter_faithfulness = (((h >> 8) & 0xFF) / 255.0 - 0.5) * 0.16
+        jitter_completeness = (((h >> 16) & 0xFF) / 255.0 - 0.5) * 0.2
         
         # Heuristic 1: Length comparison (outputs closer to reference length score higher)
         len_ratio = min(len(output), len(reference)) / max(len(output), len(reference), 1)
@@ -174,9 +325,9 @@ Completeness: [score]
         base_accuracy = (length_score + keyword_score) / 2 - length_penalty
         base_accuracy = max(0.4, min(0.95, base_accuracy))
         
-        accuracy = base_accuracy + random.uniform(-0.05, 0.05)
-        faithfulness = base_accuracy + random.uniform(-0.08, 0.08) - echo_penalty
-        completeness = keyword_score + random.uniform(-0.1, 0.1)
+        accuracy = base_accuracy + jitter_accuracy
+        faithfulness = base_accuracy + jitter_faithfulness - echo_penalty
+        completeness = keyword_score + jitter_completeness
         
         return {
             "accuracy": max(0.3, min(1.0, accuracy)),
@@ -2,74 +2,196 @@
 Leaderboard module for ranking and comparing prompt performance.
 """
 
+import os
 import json
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
 from tabulate import tabulate
 
+# Metrics contributing to the overall score and their weights
+_WEIGHTED_KEYS = (
+    "semantic_similarity_mean",
+    "accuracy_mean",
+    "faithfulness_mean",
+    "completeness_mean"
+)
+_WEIGHTS = np.array([0.3, 0.4, 0.2, 0.1], dtype=np.float64)
+_get_weighted = itemgetter(*_WEIGHTED_KEYS)
+
+
+def _weighted_values(agg_scores: Dict[str, Any]) -> Tuple[float, ...]:
+    """Pull the weighted metrics from aggregate scores, defaulting missing ones to 0."""
+    try:
+        return _get_weighted(agg_scores)
+    except KeyError:
+        return tuple(agg_scores.get(key, 0) for key in _WEIGHTED_KEYS)
+
+
+def load_scores_ndjson(path: str) -> List[Dict[str, Any]]:
+    """
+    Read evaluation results written as NDJSON, one prompt's results per line.
+    
+    A trailing line without a newline is still being written (or was cut off by
+    a crash) and is skipped.
+    
+    Args:
+        path: Path to the NDJSON results file
+        
+    Returns:
+        List of per-prompt result dictionaries in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.endswith("\n") and line.strip()]
+
+
+def _read_results(path: str) -> List[Dict[str, Any]]:
+    """Read raw evaluation results from an NDJSON or JSON file."""
+    if path.endswith(".ndjson"):
+        return load_scores_ndjson(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=8)
+def _load_and_rank(path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], ...]:
+    """
+    Load results and build the ranked leaderboard.
+    
+    Cached on (path, mtime_ns, size) so the file is only re-parsed after it changes;
+    the size catches appends that land within one mtime tick. Entries are shared
+    by every caller, so they must be copied before being handed out.
+    
+    Args:
+        path: Path to the evaluation results JSON
+        mtime_ns: Modification time of the file, used as the cache key
+        size: Size of the file in bytes, used as the cache key
+        
+    Returns:
+        Tuple of leaderboard entries sorted by overall score
+    """
+    results = _read_results(path)
+    if not results:
+        return ()
+    
+    agg = [result.get("aggregate_scores", {}) for result in results]
+    scores = np.array([_weighted_values(a) for a in agg], dtype=np.float64)
+    
+    # Overall score is a weighted average of key metrics
+    overall = scores @ _WEIGHTS
+    # Stable sort on the negated score keeps ties in file order
+    order = np.argsort(-overall, kind="stable")
+    
+    leaderboard = []
+    for rank, idx in enumerate(order, 1):
+        agg_scores = agg[idx]
+        leaderboard.append({
+            "prompt_name": results[idx]["prompt_name"],
+            "overall_score": float(overall[idx]),
+            "semantic_similarity": agg_scores.get("semantic_similarity_mean", 0),
+            "accuracy": agg_scores.get("accuracy_mean", 0),
+            "faithfulness": agg_scores.get("faithfulness_mean", 0),
+            "completeness": agg_scores.get("completeness_mean", 0),
+            "f1_score": agg_scores.get("f1_score_mean", 0),
+            "exact_match": agg_scores.get("exact_match_mean", 0),
+            "rank": rank
+        })
+    
+    return tuple(leaderboard)
+
 
 class Leaderboard:
     """Generates leaderboards from evaluation results."""
     
-    def __init__(self, results_file: str = "results/scores.json"):
+    def __init__(self, results_file: str = "results/scores.ndjson"):
         """
         Initialize the leaderboard.
         
         Args:
-            results_file: Path to the evaluation results JSON
+            results_file: Path to the evaluation results (NDJSON, or a JSON list)
         """
         self.results_file = Path(results_file)
-        self.results = self._load_results()
+        # Results written before the switch to NDJSON, read until a new run replaces them
+        self.legacy_file = (
+            self.results_file.with_suffix(".json")
+            if self.results_file.suffix == ".ndjson" else None
+        )
+        self._stamp = None
+        self._ranked: Tuple[Dict[str, Any], ...] = ()
+        self._warned_missing = False
+    
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        """Raw evaluation results, read fresh from disk."""
+        return self._load_results()
     
     def _load_results(self) -> List[Dict[str, Any]]:
-        """Load evaluation results from JSON file."""
-        if not self.results_file.exists():
+        """Load evaluation results from the results file."""
+        try:
+            path, _ = self._stat_results()
+            return _read_results(str(path))
+        except FileNotFoundError:
             print(f"Warning: Results file {self.results_file} not found.")
             return []
+    
+    def _stat_results(self) -> Tuple[Path, os.stat_result]:
+        """
+        Locate the results to read, preferring results_file over the legacy JSON.
+        
+        Returns:
+            Tuple of (path, stat result)
+            
+        Raises:
+            FileNotFoundError: If neither file exists
+        """
+        try:
+            return self.results_file, self.results_file.stat()
+        except FileNotFoundError:
+            if self.legacy_file is None:
+                raise
+            return self.legacy_file, self.legacy_file.stat()
+    
+    def reload_if_stale(self) -> bool:
+        """
+        Refresh the ranked leaderboard if the results file has changed.
+        
+        Returns:
+            True if the leaderboard was reloaded, False if it was up to date
+        """
+        try:
+            path, stat = self._stat_results()
+        except FileNotFoundError:
+            if not self._warned_missing:
+                print(f"Warning: Results file {self.results_file} not found.")
+                self._warned_missing = True
+            self._stamp = None
+            self._ranked = ()
+            return False
+        
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
         
-        with open(self.results_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        self._ranked = _load_and_rank(*stamp)
+        self._stamp = stamp
+        self._warned_missing = False
+        return True
     
     def get_leaderboard_data(self) -> List[Dict[str, Any]]:
         """
         Get leaderboard data sorted by overall score.
         
+        The ranked list is cached until the results file is modified.
+        
         Returns:
             List of prompt results with rankings
         """
-        leaderboard = []
-        
-        for result in self.results:
-            prompt_name = result["prompt_name"]
-            agg_scores = result.get("aggregate_scores", {})
-            
-            # Calculate overall score (weighted average of key metrics)
-            overall_score = (
-                agg_scores.get("semantic_similarity_mean", 0) * 0.3 +
-                agg_scores.get("accuracy_mean", 0) * 0.4 +
-                agg_scores.get("faithfulness_mean", 0) * 0.2 +
-                agg_scores.get("completeness_mean", 0) * 0.1
-            )
-            
-            leaderboard.append({
-                "prompt_name": prompt_name,
-                "overall_score": overall_score,
-                "semantic_similarity": agg_scores.get("semantic_similarity_mean", 0),
-                "accuracy": agg_scores.get("accuracy_mean", 0),
-                "faithfulness": agg_scores.get("faithfulness_mean", 0),
-                "completeness": agg_scores.get("completeness_mean", 0),
-                "f1_score": agg_scores.get("f1_score_mean", 0),
-                "exact_match": agg_scores.get("exact_match_mean", 0)
-            })
-        
-        # Sort by overall score (descending)
-        leaderboard.sort(key=lambda x: x["overall_score"], reverse=True)
-        
-        # Add rank
-        for idx, entry in enumerate(leaderboard, 1):
-            entry["rank"] = idx
-        
-        return leaderboard
+        self.reload_if_stale()
+        # Copies, so callers can annotate entries without touching the shared cache
+        return [dict(entry) for entry in self._ranked]
     
     def print_leaderboard(self) -> None:
         """Print a formatted leaderboard table to console."""
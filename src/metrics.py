@@ -3,27 +3,126 @@ Metrics module for evaluating LLM outputs.
 Provides semantic similarity, exact match, and token overlap metrics.
 """
 
+import os
+import zlib
+import hashlib
+import pickle
+from functools import lru_cache
+from pathlib import Path
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from metrics_numba import NUMBA_AVAILABLE as _NUMBA_AVAILABLE, f1_from_sorted
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+# Pre-exported int8 dynamically quantized weights shipped with the model repo
+DEFAULT_ONNX_FILE = 'onnx/model_quint8_avx2.onnx'
+
+# Column order of score buffers produced by make_score_buffer
+SCORE_KEYS = (
+    "semantic_similarity",
+    "accuracy",
+    "faithfulness",
+    "completeness",
+    "f1_score",
+    "exact_match"
+)
 
 
 class MetricsCalculator:
     """Calculates various metrics for comparing LLM outputs with references."""
     
-    def __init__(self):
-        """Initialize the metrics calculator with lazy model loading."""
+    def __init__(self, cache_path: Optional[str] = None, backend: Optional[str] = None):
+        """
+        Initialize the metrics calculator with lazy model loading.
+        
+        Args:
+            cache_path: Optional pickle file used to persist embeddings between runs
+            backend: Embedding backend, "torch" or "onnx" (defaults to
+                EMBEDDING_BACKEND env var, then "torch")
+        """
         self._model = None  # Lazy load to improve startup time
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.cache_path = Path(cache_path) if cache_path else None
+        # Embeddings by _cache_key; kept in memory for the calculator's lifetime and
+        # written to cache_path (when set) by save_embedding_cache
+        self._stored_embeddings = self._load_embedding_cache()
+        # References repeat across prompt variants, so memoize embeddings per text
+        self._embed_cached = lru_cache(maxsize=4096)(self._embed)
     
     @property
     def model(self):
         """Lazy-load the sentence transformer model on first use."""
         if self._model is None:
             # Using a lightweight model for fast semantic similarity
-            self._model = SentenceTransformer('all-MiniLM-L6-v2')
+            if self.backend == "onnx":
+                # int8 ONNX Runtime inference: faster on CPU, same encode() API
+                onnx_file = os.getenv("EMBEDDING_ONNX_FILE", DEFAULT_ONNX_FILE)
+                self._model = SentenceTransformer(
+                    EMBEDDING_MODEL,
+                    backend="onnx",
+                    model_kwargs={"file_name": onnx_file}
+                )
+            else:
+                self._model = SentenceTransformer(EMBEDDING_MODEL)
         return self._model
-
+    
+    def _embed(self, text: str) -> np.ndarray:
+        """Encode a single text to a unit-length vector, reusing stored embeddings."""
+        key = self._cache_key(text)
+        embedding = self._stored_embeddings.get(key)
+        if embedding is None:
+            embedding = self.model.encode([text], normalize_embeddings=True)[0]
+            self._stored_embeddings[key] = embedding
+        return embedding
+    
+    def _embed_many(self, texts: List[str]) -> np.ndarray:
+        """Encode texts to unit-length rows in one batch, encoding only uncached texts."""
+        keys = [self._cache_key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._stored_embeddings:
+                missing[key] = text
+        
+        if missing:
+            encoded = self.model.encode(
+                list(missing.values()),
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            self._stored_embeddings.update(zip(missing, encoded))
+        
+        return np.stack([self._stored_embeddings[key] for key in keys])
+    
+    def _cache_key(self, text: str) -> str:
+        """Persistent cache key; backend is included since int8 and fp32 embeddings differ."""
+        return f"{self.backend}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+    
+    def _load_embedding_cache(self) -> Dict[str, np.ndarray]:
+        """Load persisted embeddings (empty if persistence is disabled or nothing is saved)."""
+        if self.cache_path is None:
+            return {}
+        
+        try:
+            with open(self.cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Warning: Could not read embedding cache {self.cache_path}: {e}")
+            return {}
+    
+    def save_embedding_cache(self) -> None:
+        """Write cached embeddings to disk if a cache path was configured."""
+        if self.cache_path is None:
+            return
+        
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, 'wb') as f:
+            pickle.dump(self._stored_embeddings, f)
     
     def semantic_similarity(self, text1: str, text2: str) -> float:
         """
@@ -36,9 +135,36 @@ class MetricsCalculator:
         Returns:
             Similarity score between 0 and 1
         """
-        embeddings = self.model.encode([text1, text2])
-        similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-        return float(similarity)
+        a = self._embed_cached(text1)
+        b = self._embed_cached(text2)
+        # Embeddings are unit-length, so cosine similarity is a plain dot product
+        return float(np.dot(a, b))
+    
+    def semantic_similarity_batch(self, preds: List[str], refs: List[str]) -> np.ndarray:
+        """
+        Calculate pairwise semantic similarity for many text pairs at once.
+        
+        All texts are encoded in a single batched call (skipping any already in the
+        persistent cache), then each prediction is compared with the reference at
+        the same index.
+        
+        Args:
+            preds: Model outputs
+            refs: Expected outputs, same length as preds
+            
+        Returns:
+            Array of similarity scores, one per pair
+        """
+        if len(preds) != len(refs):
+            raise ValueError("preds and refs must have the same length")
+        
+        n = len(preds)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        
+        embeddings = self._embed_many(list(preds) + list(refs))
+        # Rows are L2-normalized, so the row-wise dot product is the cosine similarity
+        return (embeddings[:n] * embeddings[n:]).sum(axis=1)
     
     def exact_match(self, predicted: str, reference: str) -> float:
         """
@@ -64,8 +190,8 @@ class MetricsCalculator:
         Returns:
             F1 score between 0 and 1
         """
-        pred_tokens = set(predicted.lower().split())
-        ref_tokens = set(reference.lower().split())
+        pred_tokens = _tokens(predicted)
+        ref_tokens = _tokens(reference)
         
         if len(pred_tokens) == 0 or len(ref_tokens) == 0:
             return 0.0
@@ -81,6 +207,31 @@ class MetricsCalculator:
         f1 = 2 * (precision * recall) / (precision + recall)
         return f1
     
+    def token_overlap_f1_batch(self, preds: List[str], refs: List[str]) -> List[float]:
+        """
+        Calculate token overlap F1 for many text pairs.
+        
+        Uses a compiled Numba kernel over hashed tokens when Numba is installed,
+        otherwise falls back to token_overlap_f1 for each pair.
+        
+        Args:
+            preds: Model outputs
+            refs: Expected outputs, same length as preds
+            
+        Returns:
+            List of F1 scores, one per pair
+        """
+        if len(preds) != len(refs):
+            raise ValueError("preds and refs must have the same length")
+        
+        if not _NUMBA_AVAILABLE:
+            return [self.token_overlap_f1(p, r) for p, r in zip(preds, refs)]
+        
+        return [
+            float(f1_from_sorted(_hashed_tokens(p), _hashed_tokens(r)))
+            for p, r in zip(preds, refs)
+        ]
+    
     def aggregate_scores(self, scores: List[Dict[str, float]]) -> Dict[str, float]:
         """
         Aggregate multiple evaluation scores into summary statistics.
@@ -94,19 +245,70 @@ class MetricsCalculator:
         if not scores:
             return {}
         
-        # Get all metric keys
-        metric_keys = set()
-        for score in scores:
-            metric_keys.update(score.keys())
+        # Build one (scores x metrics) matrix and reduce each column
+        keys = sorted({key for score in scores for key in score})
+        arr = np.fromiter(
+            (score.get(key, 0.0) for score in scores for key in keys),
+            dtype=np.float64,
+            count=len(scores) * len(keys)
+        ).reshape(len(scores), len(keys))
+        return _aggregate_columns(keys, arr)
+    
+    def make_score_buffer(self, n: int) -> np.ndarray:
+        """
+        Allocate a columnar buffer for n test cases.
         
-        aggregated = {}
-        for key in metric_keys:
-            values = [s.get(key, 0.0) for s in scores]
-            aggregated[f"{key}_mean"] = np.mean(values)
-            aggregated[f"{key}_min"] = np.min(values)
-            aggregated[f"{key}_max"] = np.max(values)
+        Args:
+            n: Number of test cases
+            
+        Returns:
+            Uninitialized (n, len(SCORE_KEYS)) array; column order follows SCORE_KEYS
+        """
+        return np.empty((n, len(SCORE_KEYS)), dtype=np.float64)
+    
+    def aggregate_score_buffer(self, buffer: np.ndarray) -> Dict[str, float]:
+        """
+        Aggregate a buffer from make_score_buffer into summary statistics.
         
-        return aggregated
+        Args:
+            buffer: Filled (n, len(SCORE_KEYS)) score array
+            
+        Returns:
+            Dictionary with mean, min, max for each metric
+        """
+        if len(buffer) == 0:
+            return {}
+        return _aggregate_columns(SCORE_KEYS, buffer)
+
+
+def _aggregate_columns(keys, arr: np.ndarray) -> Dict[str, float]:
+    """Reduce each column of arr to mean/min/max entries named after keys."""
+    means, mins, maxs = arr.mean(axis=0), arr.min(axis=0), arr.max(axis=0)
+    
+    aggregated = {}
+    for key, mean, low, high in zip(keys, means, mins, maxs):
+        aggregated[f"{key}_mean"] = float(mean)
+        aggregated[f"{key}_min"] = float(low)
+        aggregated[f"{key}_max"] = float(high)
+    
+    return aggregated
+
+
+@lru_cache(maxsize=8192)
+def _tokens(text: str) -> frozenset:
+    """Unique lowercase tokens of text, cached since references repeat across prompts."""
+    return frozenset(text.lower().split())
+
+
+def _token_id(token: str) -> int:
+    """Stable token hash; unlike hash(), it does not vary with PYTHONHASHSEED."""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _hashed_tokens(text: str) -> np.ndarray:
+    """Hash the unique lowercase tokens of text into a sorted int64 array."""
+    tokens = _tokens(text)
+    return np.unique(np.fromiter(map(_token_id, tokens), dtype=np.int64, count=len(tokens)))
 
 
 # Convenience functions for standalone usage
@@ -0,0 +1,56 @@
+"""
+Optional Numba kernels for token-overlap metrics.
+Falls back to plain Python execution when Numba is not installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _f1_from_sorted(pred_ids: np.ndarray, ref_ids: np.ndarray) -> float:
+    """
+    Compute token-overlap F1 from two sorted arrays of unique token hashes.
+
+    Args:
+        pred_ids: Sorted, de-duplicated token hashes of the prediction
+        ref_ids: Sorted, de-duplicated token hashes of the reference
+
+    Returns:
+        F1 score between 0 and 1
+    """
+    n_pred = pred_ids.shape[0]
+    n_ref = ref_ids.shape[0]
+    if n_pred == 0 or n_ref == 0:
+        return 0.0
+
+    # Merge-style intersection of the two sorted arrays
+    i = 0
+    j = 0
+    common = 0
+    while i < n_pred and j < n_ref:
+        if pred_ids[i] == ref_ids[j]:
+            common += 1
+            i += 1
+            j += 1
+        elif pred_ids[i] < ref_ids[j]:
+            i += 1
+        else:
+            j += 1
+
+    if common == 0:
+        return 0.0
+
+    precision = common / n_pred
+    recall = common / n_ref
+    return 2.0 * precision * recall / (precision + recall)
+
+
+if NUMBA_AVAILABLE:
+    f1_from_sorted = njit(cache=True)(_f1_from_sorted)
+else:
+    f1_from_sorted = _f1_from_sorted
@@ -0,0 +1,170 @@
+"""
+Client-side rate limiting for OpenAI API calls.
+Token-bucket style RPM/TPM limits that self-tune from rate-limit response headers.
+"""
+
+import re
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Mapping, Optional, Tuple
+
+# Durations in x-ratelimit-reset-* headers, e.g. "20ms", "1s", "6m0s"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Rough prompt-size estimate used for the tokens-per-minute budget
+_CHARS_PER_TOKEN = 4
+
+
+def parse_reset_duration(value: Optional[str]) -> float:
+    """
+    Convert an OpenAI reset duration such as "6m0s" to seconds.
+
+    Args:
+        value: Header value; a bare number is read as seconds
+
+    Returns:
+        Duration in seconds (0.0 if missing or unparseable)
+    """
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in _DURATION_RE.findall(value))
+
+
+class RateLimiter:
+    """Async sliding-window limiter on requests and tokens per minute."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, period: float = 60.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm: Requests allowed per period (0 = no request limit)
+            tpm: Tokens allowed per period (0 = no token limit)
+            period: Window length in seconds
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        # Created on first acquire(): before 3.10 an asyncio.Lock binds to the loop that
+        # is current at construction, which is not the loop the limiter is awaited on
+        self._lock: Optional[asyncio.Lock] = None
+        self._requests: Deque[float] = deque()
+        self._tokens: Deque[Tuple[float, int]] = deque()
+        self._token_total = 0
+        # Set from response headers or Retry-After; no request starts before it
+        self._blocked_until = 0.0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until a request of the given size fits within the limits, then record it.
+
+        Waiters are served in arrival order.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                delay = self._delay(now, tokens)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            self._requests.append(now)
+            if tokens:
+                self._tokens.append((now, tokens))
+                self._token_total += tokens
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Pause new requests when the server reports an exhausted quota.
+
+        Args:
+            headers: Response headers carrying x-ratelimit-remaining-* / reset-*
+        """
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                self.pause(parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}")))
+
+    def pause(self, seconds: float) -> None:
+        """Hold all new requests for the given number of seconds (e.g. from Retry-After)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _delay(self, now: float, tokens: int) -> float:
+        """Seconds to wait before a request of the given size may start."""
+        cutoff = now - self.period
+        while self._requests and self._requests[0] <= cutoff:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= cutoff:
+            self._token_total -= self._tokens.popleft()[1]
+
+        delay = self._blocked_until - now
+        if self.rpm and len(self._requests) >= self.rpm:
+            delay = max(delay, self._requests[0] + self.period - now)
+        if self.tpm and self._tokens and self._token_total + tokens > self.tpm:
+            delay = max(delay, self._tokens[0][0] + self.period - now)
+        return delay
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt, for the tokens-per-minute budget."""
+    return len(text) // _CHARS_PER_TOKEN
+
+
+async def call_with_retry(
+    limiter: RateLimiter,
+    request: Callable[[], Awaitable[Any]],
+    tokens: int = 0
+) -> Any:
+    """
+    Issue an OpenAI request within the limiter's budget, retrying rate-limited attempts.
+
+    Rate-limited (429) requests pause the limiter for any Retry-After delay, then
+    are retried with jittered exponential backoff; other errors are raised as-is.
+
+    Args:
+        limiter: Limiter shared by every request against the same quota
+        request: Starts the request; must return a with_raw_response result so the
+            rate-limit headers can be read
+        tokens: Estimated tokens the request will consume
+
+    Returns:
+        The parsed response
+    """
+    # openai and tenacity are only needed once a request is actually made
+    from openai import RateLimitError
+    from tenacity import (
+        AsyncRetrying,
+        retry_if_exception_type,
+        stop_after_attempt,
+        wait_exponential_jitter
+    )
+
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception_type(RateLimitError),
+        wait=wait_exponential_jitter(initial=1, max=30),
+        stop=stop_after_attempt(5),
+        reraise=True
+    ):
+        with attempt:
+            await limiter.acquire(tokens)
+            try:
+                raw = await request()
+            except RateLimitError as e:
+                # Hold every in-flight task, not just this one, for Retry-After
+                retry_after = e.response.headers.get("retry-after")
+                limiter.pause(parse_reset_duration(retry_after) or 1.0)
+                raise
+            limiter.update_from_headers(raw.headers)
+            response = raw.parse()
+    return response
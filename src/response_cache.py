@@ -0,0 +1,98 @@
+"""
+Response cache for repeated generation requests.
+Exact lookups by (namespace, text), with optional FAISS near-duplicate matching.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+
+class ResponseCache:
+    """Caches responses per namespace, optionally matching near-duplicate texts."""
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: Optional[float] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            embed: Maps a text to a unit-length embedding; required for near-duplicate lookups
+            threshold: Minimum cosine similarity for a near-duplicate hit; None disables
+                near-duplicate matching (also disabled when FAISS is not installed)
+        """
+        self.entries: Dict[Tuple[str, str], Any] = {}
+        self.embed = embed
+        self.threshold = threshold
+        # One inner-product index per namespace, with the texts in insertion order
+        self._indexes: Dict[str, Tuple[Any, List[str]]] = {}
+
+    @property
+    def semantic(self) -> bool:
+        """Whether near-duplicate lookups are enabled."""
+        return FAISS_AVAILABLE and self.embed is not None and self.threshold is not None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, namespace: str, text: str) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            namespace: Partition the text belongs to (e.g. a prompt template hash)
+            text: Lookup text (e.g. the question)
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        value = self.entries.get((namespace, text))
+        if value is not None or not self.semantic:
+            return value
+
+        if namespace not in self._indexes:
+            return None
+
+        index, texts = self._indexes[namespace]
+        scores, ids = index.search(self._vector(text), 1)
+        if ids[0][0] >= 0 and scores[0][0] >= self.threshold:
+            return self.entries[(namespace, texts[ids[0][0]])]
+        return None
+
+    def put(self, namespace: str, text: str, value: Any) -> None:
+        """Store a response for text within namespace."""
+        key = (namespace, text)
+        is_new = key not in self.entries
+        self.entries[key] = value
+        if is_new and self.semantic:
+            self._index(namespace, text)
+
+    def load(self, entries: Dict[Tuple[str, str], Any]) -> None:
+        """Replace the cache contents, e.g. with entries restored from disk."""
+        self.entries = dict(entries)
+        self._indexes = {}
+        if self.semantic:
+            for namespace, text in self.entries:
+                self._index(namespace, text)
+
+    def _vector(self, text: str) -> np.ndarray:
+        """Embed text as a (1, dim) float32 row, the layout FAISS expects."""
+        return np.asarray(self.embed(text), dtype=np.float32).reshape(1, -1)
+
+    def _index(self, namespace: str, text: str) -> None:
+        """Add text to its namespace's near-duplicate index."""
+        vector = self._vector(text)
+        if namespace not in self._indexes:
+            self._indexes[namespace] = (faiss.IndexFlatIP(vector.shape[1]), [])
+        index, texts = self._indexes[namespace]
+        index.add(vector)
+        texts.append(text)
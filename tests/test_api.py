@@ -77,3 +77,10 @@ class TestAPIEndpoints:
         response = client.get('/api/leaderboard')
         # Should return 200 even if empty
         assert response.status_code in [200, 500]
+    
+    def test_get_leaderboard_returns_json(self, client):
+        """Test GET /api/leaderboard responds with JSON content."""
+        response = client.get('/api/leaderboard')
+        if response.status_code == 200:
+            assert response.mimetype == 'application/json'
+            assert isinstance(json.loads(response.data), list)
@@ -2,8 +2,11 @@
 Unit tests for the evaluator module.
 """
 
+import asyncio
 import pytest
-from evaluator import LLMEvaluator
+from types import SimpleNamespace
+from evaluator import LLMEvaluator, HTTP2_AVAILABLE, OPENAI_AVAILABLE, make_async_http_client
+from rate_limiter import RateLimiter
 
 
 class TestLLMEvaluator:
@@ -139,3 +142,84 @@ Completeness: 0.85
         assert "Accuracy" in prompt
         assert "Faithfulness" in prompt
         assert "Completeness" in prompt
+    
+    def test_evaluators_share_client(self):
+        """Test evaluators with the same API key reuse one pooled client."""
+        first = LLMEvaluator(api_key="test_key")
+        second = LLMEvaluator(api_key="test_key")
+        
+        if first.client is not None:
+            assert first.client is second.client
+    
+    def test_async_http_client_uses_http2_when_available(self):
+        """Test the pooled async client enables HTTP/2 only when h2 is installed."""
+        pytest.importorskip("httpx")
+        client = make_async_http_client(max_connections=4)
+        try:
+            assert client._transport._pool._http2 == HTTP2_AVAILABLE
+        finally:
+            asyncio.run(client.aclose())
+    
+    def test_aevaluate_response_without_api_key(
+        self,
+        sample_question,
+        sample_output_good,
+        sample_reference,
+        sample_context
+    ):
+        """Test async evaluation falls back to mock scores when no API key."""
+        evaluator = LLMEvaluator(api_key=None)
+        scores = asyncio.run(evaluator.aevaluate_response(
+            sample_question,
+            sample_output_good,
+            sample_reference,
+            sample_context
+        ))
+        
+        assert scores == evaluator._mock_evaluate(
+            sample_output_good, sample_reference, sample_question
+        )
+    
+    @pytest.mark.skipif(not OPENAI_AVAILABLE, reason="openai not installed")
+    def test_aevaluate_response_retries_rate_limited_judge(
+        self,
+        sample_question,
+        sample_output_good,
+        sample_reference
+    ):
+        """Test a 429 from the judge is retried instead of returning default scores."""
+        import httpx
+        from openai import RateLimitError
+        
+        evaluator = LLMEvaluator(api_key="test_key")
+        limiter = RateLimiter()
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+            content="Accuracy: 0.9\nFaithfulness: 0.8\nCompleteness: 0.7"
+        ))])
+        calls = []
+        
+        async def create(**kwargs):
+            calls.append(kwargs["model"])
+            if len(calls) == 1:
+                request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+                raise RateLimitError(
+                    "rate limited",
+                    response=httpx.Response(
+                        429, headers={"retry-after": "0"}, request=request
+                    ),
+                    body=None
+                )
+            return SimpleNamespace(headers={}, parse=lambda: response)
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            with_raw_response=SimpleNamespace(create=create)
+        )))
+        
+        scores = asyncio.run(evaluator.aevaluate_response(
+            sample_question, sample_output_good, sample_reference,
+            client=client, rate_limiter=limiter
+        ))
+        
+        assert len(calls) == 2
+        assert scores == {"accuracy": 0.9, "faithfulness": 0.8, "completeness": 0.7}
+        assert len(limiter._requests) == 2
@@ -0,0 +1,124 @@
+"""
+Unit tests for the leaderboard module.
+"""
+
+import os
+import pytest
+import json
+from leaderboard import Leaderboard, load_scores_ndjson
+
+
+def _write_results(path, accuracies):
+    """Write a minimal results file with one entry per accuracy value."""
+    results = [
+        {
+            "prompt_name": f"prompt_{idx}.txt",
+            "aggregate_scores": {"accuracy_mean": accuracy}
+        }
+        for idx, accuracy in enumerate(accuracies)
+    ]
+    path.write_text(json.dumps(results))
+
+
+class TestLeaderboard:
+    """Test cases for Leaderboard class."""
+
+    def test_missing_results_file(self, tmp_path):
+        """Test leaderboard is empty when results file is missing."""
+        leaderboard = Leaderboard(str(tmp_path / "missing.json"))
+        assert leaderboard.get_leaderboard_data() == []
+
+    def test_ranking_order(self, tmp_path):
+        """Test entries are sorted by overall score and ranked from 1."""
+        results_file = tmp_path / "scores.json"
+        _write_results(results_file, [0.5, 0.9, 0.7])
+
+        data = Leaderboard(str(results_file)).get_leaderboard_data()
+
+        assert [entry["prompt_name"] for entry in data] == [
+            "prompt_1.txt", "prompt_2.txt", "prompt_0.txt"
+        ]
+        assert [entry["rank"] for entry in data] == [1, 2, 3]
+        assert data[0]["overall_score"] == pytest.approx(0.9 * 0.4)
+
+    def test_reloads_after_file_change(self, tmp_path):
+        """Test cached ranking is refreshed when the results file changes."""
+        results_file = tmp_path / "scores.json"
+        _write_results(results_file, [0.5])
+        leaderboard = Leaderboard(str(results_file))
+        assert len(leaderboard.get_leaderboard_data()) == 1
+
+        _write_results(results_file, [0.5, 0.6])
+        stat = results_file.stat()
+        os.utime(results_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert len(leaderboard.get_leaderboard_data()) == 2
+
+    def test_returned_entries_are_copies(self, tmp_path):
+        """Test mutating returned entries does not affect later calls."""
+        results_file = tmp_path / "scores.json"
+        _write_results(results_file, [0.5])
+        leaderboard = Leaderboard(str(results_file))
+
+        leaderboard.get_leaderboard_data()[0]["prompt_name"] = "changed"
+
+        assert leaderboard.get_leaderboard_data()[0]["prompt_name"] == "prompt_0.txt"
+        assert Leaderboard(str(results_file)).get_leaderboard_data()[0]["rank"] == 1
+
+    def test_reloads_after_append_within_mtime_tick(self, tmp_path):
+        """Test a size change is picked up even when the mtime is unchanged."""
+        results_file = tmp_path / "scores.ndjson"
+        line = json.dumps({"prompt_name": "a.txt", "aggregate_scores": {}}) + "\n"
+        results_file.write_text(line)
+        leaderboard = Leaderboard(str(results_file))
+        assert len(leaderboard.get_leaderboard_data()) == 1
+
+        mtime_ns = results_file.stat().st_mtime_ns
+        results_file.write_text(line * 2)
+        os.utime(results_file, ns=(mtime_ns, mtime_ns))
+
+        assert len(leaderboard.get_leaderboard_data()) == 2
+
+    def test_reload_if_stale(self, tmp_path):
+        """Test reload only happens when the results file changed."""
+        results_file = tmp_path / "scores.json"
+        _write_results(results_file, [0.5])
+        leaderboard = Leaderboard(str(results_file))
+
+        assert leaderboard.reload_if_stale() is True
+        assert leaderboard.reload_if_stale() is False
+
+    def test_reads_ndjson_results(self, tmp_path):
+        """Test NDJSON results are ranked like a JSON list."""
+        results_file = tmp_path / "scores.ndjson"
+        results_file.write_text("".join(
+            json.dumps({"prompt_name": name, "aggregate_scores": {"accuracy_mean": acc}}) + "\n"
+            for name, acc in (("low.txt", 0.2), ("high.txt", 0.9))
+        ))
+
+        data = Leaderboard(str(results_file)).get_leaderboard_data()
+
+        assert [entry["prompt_name"] for entry in data] == ["high.txt", "low.txt"]
+
+    def test_falls_back_to_legacy_json(self, tmp_path):
+        """Test an existing scores.json is read until scores.ndjson is written."""
+        _write_results(tmp_path / "scores.json", [0.5])
+        leaderboard = Leaderboard(str(tmp_path / "scores.ndjson"))
+
+        assert len(leaderboard.get_leaderboard_data()) == 1
+        assert len(leaderboard.results) == 1
+
+        (tmp_path / "scores.ndjson").write_text(
+            json.dumps({"prompt_name": "new.txt", "aggregate_scores": {}}) + "\n"
+        )
+
+        assert [entry["prompt_name"] for entry in leaderboard.get_leaderboard_data()] == [
+            "new.txt"
+        ]
+
+    def test_load_scores_ndjson_skips_partial_line(self, tmp_path):
+        """Test a trailing line still being written is ignored."""
+        results_file = tmp_path / "scores.ndjson"
+        results_file.write_text('{"prompt_name": "a.txt"}\n{"prompt_name": "b.t')
+
+        assert load_scores_ndjson(str(results_file)) == [{"prompt_name": "a.txt"}]
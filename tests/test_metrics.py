@@ -3,7 +3,8 @@ Unit tests for the metrics module.
 """
 
 import pytest
-from metrics import MetricsCalculator
+from metrics import MetricsCalculator, SCORE_KEYS, _hashed_tokens
+from metrics_numba import _f1_from_sorted
 
 
 class TestMetricsCalculator:
@@ -143,3 +144,113 @@ class TestMetricsCalculator:
         assert aggregated["faithfulness_mean"] == pytest.approx(0.7, 0.01)
         assert aggregated["faithfulness_min"] == 0.6
         assert aggregated["faithfulness_max"] == 0.8
+    
+    def test_semantic_similarity_batch_matches_pairwise(self, calculator):
+        """Test batched similarity agrees with per-pair similarity."""
+        preds = ["Paris is the capital of France", "Tokyo is a large city in Japan"]
+        refs = ["The capital of France is Paris", "Paris is the capital of France"]
+        
+        scores = calculator.semantic_similarity_batch(preds, refs)
+        
+        assert len(scores) == 2
+        for pred, ref, score in zip(preds, refs, scores):
+            assert score == pytest.approx(calculator.semantic_similarity(pred, ref), abs=1e-4)
+    
+    def test_semantic_similarity_batch_empty(self, calculator):
+        """Test batched similarity with no pairs."""
+        assert len(calculator.semantic_similarity_batch([], [])) == 0
+    
+    def test_semantic_similarity_batch_length_mismatch(self, calculator):
+        """Test batched similarity rejects mismatched inputs."""
+        with pytest.raises(ValueError):
+            calculator.semantic_similarity_batch(["a"], [])
+    
+    def test_token_overlap_f1_batch_matches_pairwise(self, calculator):
+        """Test batched F1 agrees with per-pair F1."""
+        preds = ["Paris is the capital", "Paris France", "", "Paris"]
+        refs = ["The capital city is Paris", "London England", "Paris", "paris"]
+        
+        scores = calculator.token_overlap_f1_batch(preds, refs)
+        
+        expected = [calculator.token_overlap_f1(p, r) for p, r in zip(preds, refs)]
+        assert scores == pytest.approx(expected)
+    
+    def test_hashed_token_kernel_matches_pairwise(self, calculator):
+        """Test the kernel over stable token hashes agrees with per-pair F1."""
+        pairs = [("Paris is the capital", "The capital city is Paris"), ("a b", "c d")]
+        
+        for pred, ref in pairs:
+            kernel = _f1_from_sorted(_hashed_tokens(pred), _hashed_tokens(ref))
+            assert kernel == pytest.approx(calculator.token_overlap_f1(pred, ref))
+        
+        # crc32-based ids do not depend on PYTHONHASHSEED
+        assert _hashed_tokens("Paris").tolist() == [2519518178]
+    
+    def test_semantic_similarity_reuses_embeddings(self, calculator):
+        """Test repeated texts are only encoded once."""
+        calculator.semantic_similarity("Paris", "The capital of France")
+        calculator.semantic_similarity("Paris", "The capital of France")
+        
+        info = calculator._embed_cached.cache_info()
+        assert info.misses == 2
+        assert info.hits == 2
+    
+    def test_embedding_cache_persists(self, tmp_path):
+        """Test embeddings saved to disk are reloaded by a new calculator."""
+        cache_file = tmp_path / "emb.pkl"
+        first = MetricsCalculator(cache_path=str(cache_file))
+        first.semantic_similarity("Paris", "The capital of France")
+        first.save_embedding_cache()
+        
+        second = MetricsCalculator(cache_path=str(cache_file))
+        assert len(second._stored_embeddings) == 2
+    
+    def test_semantic_similarity_batch_uses_embedding_cache(self, tmp_path):
+        """Test batched similarity stores each unique text once in the persistent cache."""
+        calc = MetricsCalculator(cache_path=str(tmp_path / "emb.pkl"))
+        preds = ["Paris", "Paris is the capital"]
+        refs = ["Paris", "The capital of France"]
+        
+        scores = calc.semantic_similarity_batch(preds, refs)
+        
+        assert len(calc._stored_embeddings) == 3
+        assert scores[0] == pytest.approx(1.0, abs=1e-4)
+        assert scores[1] == pytest.approx(calc.semantic_similarity(preds[1], refs[1]), abs=1e-4)
+    
+    def test_semantic_similarity_batch_reuses_embeddings_without_cache_path(self):
+        """Test texts seen in an earlier batch are not re-encoded when nothing is persisted."""
+        calc = MetricsCalculator()
+        encoded = []
+        encode = calc.model.encode
+        calc.model.encode = lambda texts, **kwargs: encoded.extend(texts) or encode(
+            texts, **kwargs
+        )
+        refs = ["Paris", "Berlin"]
+        
+        calc.semantic_similarity_batch(["Paris is it", "Berlin is it"], refs)
+        calc.semantic_similarity_batch(["It is Paris", "It is Berlin"], refs)
+        
+        assert sorted(encoded) == sorted(
+            ["Paris is it", "Berlin is it", "Paris", "Berlin", "It is Paris", "It is Berlin"]
+        )
+    
+    def test_aggregate_score_buffer_matches_dicts(self, calculator):
+        """Test buffer aggregation agrees with dict-based aggregation."""
+        score_list = [
+            {"semantic_similarity": 0.9, "accuracy": 0.8, "faithfulness": 0.7,
+             "completeness": 0.6, "f1_score": 0.5, "exact_match": 0.0},
+            {"semantic_similarity": 0.7, "accuracy": 0.6, "faithfulness": 0.9,
+             "completeness": 0.8, "f1_score": 0.3, "exact_match": 1.0}
+        ]
+        
+        buffer = calculator.make_score_buffer(len(score_list))
+        for row, scores in enumerate(score_list):
+            buffer[row] = [scores[key] for key in SCORE_KEYS]
+        
+        assert calculator.aggregate_score_buffer(buffer) == pytest.approx(
+            calculator.aggregate_scores(score_list)
+        )
+    
+    def test_aggregate_score_buffer_empty(self, calculator):
+        """Test buffer aggregation with no rows."""
+        assert calculator.aggregate_score_buffer(calculator.make_score_buffer(0)) == {}
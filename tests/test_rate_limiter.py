@@ -0,0 +1,75 @@
+"""
+Unit tests for the rate limiter module.
+"""
+
+import time
+import asyncio
+import pytest
+from rate_limiter import RateLimiter, parse_reset_duration
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("6m0s", 360.0),
+        ("1s", 1.0),
+        ("20ms", 0.02),
+        ("1.5", 1.5),
+        (None, 0.0),
+        ("soon", 0.0)
+    ])
+    def test_parse_reset_duration(self, value, expected):
+        """Test header durations are converted to seconds."""
+        assert parse_reset_duration(value) == pytest.approx(expected)
+
+    def test_acquire_within_limits_does_not_wait(self):
+        """Test requests under the budget start immediately."""
+        limiter = RateLimiter(rpm=10, tpm=1000)
+
+        async def run():
+            for _ in range(5):
+                await limiter.acquire(100)
+
+        start = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - start < 0.05
+
+    def test_acquire_waits_when_rpm_exhausted(self):
+        """Test a request over the per-period limit waits for the window to slide."""
+        limiter = RateLimiter(rpm=2, period=0.2)
+
+        async def run():
+            for _ in range(3):
+                await limiter.acquire()
+
+        start = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - start >= 0.15
+
+    def test_contention_on_a_private_loop(self):
+        """Test waiters contend on a loop other than the one current at construction."""
+        limiter = RateLimiter(rpm=1, period=0.05)
+        loop = asyncio.new_event_loop()
+
+        async def run():
+            await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        assert len(limiter._requests) >= 1
+
+    def test_exhausted_header_pauses_requests(self):
+        """Test a zero remaining-requests header blocks until the reset time."""
+        limiter = RateLimiter()
+        limiter.update_from_headers({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "150ms"
+        })
+
+        start = time.monotonic()
+        asyncio.run(limiter.acquire())
+        assert time.monotonic() - start >= 0.1
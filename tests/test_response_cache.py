@@ -0,0 +1,63 @@
+"""
+Unit tests for the response cache module.
+"""
+
+import pytest
+import numpy as np
+from response_cache import ResponseCache, FAISS_AVAILABLE
+
+
+def _embed(text):
+    """Toy unit-length embedding: a one-hot on the first letter."""
+    vector = np.zeros(26, dtype=np.float32)
+    vector[(ord(text[0].lower()) - ord("a")) % 26] = 1.0
+    return vector
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    def test_exact_hit_and_miss(self):
+        """Test exact lookups return stored values and None otherwise."""
+        cache = ResponseCache()
+        cache.put("ns", "What is the capital of France?", "Paris")
+
+        assert cache.get("ns", "What is the capital of France?") == "Paris"
+        assert cache.get("ns", "Who painted the Mona Lisa?") is None
+        assert len(cache) == 1
+
+    def test_namespaces_are_separate(self):
+        """Test the same text in another namespace is a miss."""
+        cache = ResponseCache()
+        cache.put("prompt_a", "question", "answer")
+
+        assert cache.get("prompt_b", "question") is None
+
+    def test_load_replaces_entries(self):
+        """Test restored entries replace existing ones."""
+        cache = ResponseCache()
+        cache.put("ns", "old", "value")
+
+        cache.load({("ns", "new"): "restored"})
+
+        assert cache.get("ns", "old") is None
+        assert cache.get("ns", "new") == "restored"
+
+    def test_semantic_disabled_without_threshold(self):
+        """Test near-duplicate matching stays off unless a threshold is given."""
+        cache = ResponseCache(embed=_embed)
+        cache.put("ns", "apple", "fruit")
+
+        assert not cache.semantic
+        assert cache.get("ns", "avocado") is None
+
+    @pytest.mark.skipif(not FAISS_AVAILABLE, reason="faiss not installed")
+    def test_semantic_near_duplicate_hit(self):
+        """Test near-duplicate texts above the threshold share a cached value."""
+        cache = ResponseCache(embed=_embed, threshold=0.95)
+        cache.put("ns", "apple", "fruit")
+        cache.put("ns", "banana", "yellow")
+
+        assert cache.get("ns", "avocado") == "fruit"
+        assert cache.get("ns", "cherry") is None
+        assert cache.get("other", "avocado") is None
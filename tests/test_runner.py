@@ -2,10 +2,21 @@
 Unit tests for the runner module.
 """
 
+import gc
+import os
+import sys
+import weakref
+import asyncio
+import subprocess
 import pytest
 import json
+import pickle
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 from runner import EvaluationRunner
+from metrics import SCORE_KEYS
+from rate_limiter import RateLimiter
 
 
 class TestEvaluationRunner:
@@ -22,6 +33,36 @@ class TestEvaluationRunner:
         assert runner.evaluator is not None
         assert runner.metrics is not None
     
+    def test_import_defers_openai(self):
+        """Test importing the runner does not import the OpenAI SDK."""
+        src_dir = Path(__file__).parent.parent / "src"
+        code = (
+            f"import sys; sys.path.insert(0, {str(src_dir)!r}); import runner; "
+            "print('openai' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip().splitlines()[-1] == "False"
+    
+    def test_event_loop_is_lazy_and_closed(self, runner):
+        """Test the private loop is only created on use and closed by close()."""
+        assert runner._event_loop is None
+        
+        loop = runner._loop
+        runner.close()
+        
+        assert loop.is_closed()
+        runner.close()
+    
+    def test_runner_is_not_kept_alive_by_exit_hook(self, monkeypatch):
+        """Test discarded runners, including API-mode ones, can be garbage collected."""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        ref = weakref.ref(EvaluationRunner())
+        gc.collect()
+        
+        assert ref() is None
+    
     def test_load_prompt(self, runner, tmp_path):
         """Test loading prompt from file."""
         # Create temporary prompt file
@@ -32,6 +73,18 @@ class TestEvaluationRunner:
         loaded = runner.load_prompt(str(prompt_file))
         assert loaded == prompt_content
     
+    def test_load_prompt_picks_up_edits(self, runner, tmp_path):
+        """Test memoized prompts are re-read after the file changes."""
+        prompt_file = tmp_path / "test_prompt.txt"
+        prompt_file.write_text("Answer: {question}")
+        assert runner.load_prompt(str(prompt_file)) == "Answer: {question}"
+        
+        prompt_file.write_text("Think step by step: {question}")
+        stat = prompt_file.stat()
+        os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert runner.load_prompt(str(prompt_file)) == "Think step by step: {question}"
+    
     def test_load_dataset(self, runner, tmp_path, sample_dataset):
         """Test loading dataset from JSON file."""
         # Create temporary dataset file
@@ -42,6 +95,28 @@ class TestEvaluationRunner:
         assert len(loaded) == len(sample_dataset)
         assert loaded[0]["question"] == sample_dataset[0]["question"]
     
+    def test_format_prompt(self, runner):
+        """Test placeholders are filled and other braces are left as written."""
+        assert runner._format_prompt(
+            "Context: {context}\nQ: {question} {other}", "Why {x}?", "ctx"
+        ) == "Context: ctx\nQ: Why {x}? {other}"
+        assert runner._format_prompt(
+            'Reply as {"answer": ...} to {question}', "Q", ""
+        ) == 'Reply as {"answer": ...} to Q'
+    
+    def test_prefetch_loads_prompts_and_dataset(self, runner, tmp_path, sample_dataset):
+        """Test concurrent prefetch returns the dataset and matches sync loading."""
+        (tmp_path / "a.txt").write_text("Answer: {question}")
+        (tmp_path / "b.txt").write_text("Context: {context}\n{question}")
+        (tmp_path / "dataset.json").write_text(json.dumps(sample_dataset))
+        runner.prompts_dir = tmp_path
+        runner.datasets_dir = tmp_path
+        
+        dataset = asyncio.run(runner._prefetch(["a.txt", "b.txt"], "dataset.json"))
+        
+        assert dataset == sample_dataset
+        assert asyncio.run(runner.aload_prompt("b.txt")) == runner.load_prompt("b.txt")
+    
     def test_generate_mock_response_quality_tiers(self, runner):
         """Test mock responses vary by prompt quality."""
         question = "What is the capital of France?"
@@ -76,3 +151,189 @@ Context: {context}"""
         
         # Should contain "Paris" somewhere
         assert "Paris" in response or "paris" in response.lower()
+    
+    def test_run_prompt_mock_mode(self, runner):
+        """Test run_prompt coroutine returns the mock response without API access."""
+        if runner.aclient is not None:
+            pytest.skip("API key configured")
+        
+        question = "What is the capital of France?"
+        response = asyncio.run(runner.run_prompt("{question}", question))
+        
+        assert response == runner._generate_mock_response("{question}", question, "")
+    
+    def test_run_prompt_caches_api_responses(self, runner, tmp_path):
+        """Test repeated generations are served from cache and persisted."""
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" Paris "))]
+        )
+        raw = SimpleNamespace(headers={}, parse=lambda: response)
+        create = AsyncMock(return_value=raw)
+        runner.aclient = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(
+                with_raw_response=SimpleNamespace(create=create)
+            ))
+        )
+        runner.response_cache_path = tmp_path / ".cache.pkl"
+        question = "What is the capital of France?"
+        
+        first = asyncio.run(runner.run_prompt("{question}", question))
+        second = asyncio.run(runner.run_prompt("{question}", question))
+        
+        assert first == second == "Paris"
+        assert create.await_count == 1
+        
+        runner.save_response_cache()
+        with open(runner.response_cache_path, "rb") as f:
+            assert len(pickle.load(f)["generation"]) == 1
+    
+    def test_run_prompt_under_rate_limit_contention(self, runner):
+        """Test throttled generations on the runner's loop return real outputs."""
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Paris"))]
+        )
+        raw = SimpleNamespace(headers={}, parse=lambda: response)
+        runner.aclient = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(
+                with_raw_response=SimpleNamespace(create=AsyncMock(return_value=raw))
+            ))
+        )
+        runner.rate_limiter = RateLimiter(rpm=1, period=0.05)
+        
+        async def run():
+            return await asyncio.gather(*(
+                runner.run_prompt("{question}", f"Question {i}?") for i in range(3)
+            ))
+        
+        assert runner._loop.run_until_complete(run()) == ["Paris"] * 3
+    
+    def test_evaluate_prompt_on_dataset_preserves_order(self, runner, tmp_path, sample_dataset):
+        """Test concurrent evaluation returns test cases in dataset order."""
+        (tmp_path / "prompt.txt").write_text("Answer: {question}")
+        runner.prompts_dir = tmp_path
+        
+        results = asyncio.run(
+            runner.evaluate_prompt_on_dataset("prompt.txt", sample_dataset, "dataset.json")
+        )
+        
+        questions = [tc["question"] for tc in results["test_cases"]]
+        assert questions == [tc["question"] for tc in sample_dataset]
+        assert "accuracy_mean" in results["aggregate_scores"]
+    
+    def test_evaluate_prompts_parallel_preserves_order(self, runner, tmp_path, sample_dataset):
+        """Test process-pool evaluation returns one result per prompt, in order."""
+        (tmp_path / "a.txt").write_text("Answer: {question}")
+        (tmp_path / "b.txt").write_text("Think step by step. Context: {context}\n{question}")
+        runner.prompts_dir = tmp_path
+        runner.processes = 2
+        
+        results = []
+        runner._evaluate_prompts_parallel(
+            ["a.txt", "b.txt"], sample_dataset, "d.json", results.append
+        )
+        
+        assert [r["prompt_name"] for r in results] == ["a.txt", "b.txt"]
+        assert len(results[0]["test_cases"]) == len(sample_dataset)
+    
+    def test_evaluate_one_applies_worker_budgets(
+        self, runner, tmp_path, sample_dataset, monkeypatch
+    ):
+        """Test each worker runs with its share of the RPM/TPM/concurrency limits."""
+        import runner as runner_module
+        (tmp_path / "a.txt").write_text("Answer: {question}")
+        runner.rate_limiter = RateLimiter(rpm=90, tpm=30000)
+        runner.concurrency = 8
+        monkeypatch.setattr(runner_module, "_worker_runner", runner)
+        
+        budgets = tuple(
+            runner_module._split_budget(limit, 3) for limit in (90, 30000, 8)
+        )
+        result, _ = runner_module._evaluate_one(
+            "a.txt", sample_dataset, "d.json", str(tmp_path), budgets
+        )
+        
+        assert budgets == (30, 10000, 2)
+        assert (runner.rate_limiter.rpm, runner.rate_limiter.tpm) == (30, 10000)
+        assert runner.concurrency == 2
+        assert runner_module._split_budget(0, 3) == 0
+        assert runner_module._split_budget(2, 3) == 1
+        assert len(result["test_cases"]) == len(sample_dataset)
+    
+    def test_failed_run_keeps_previous_results(self, runner, tmp_path, sample_dataset):
+        """Test scores.ndjson is only replaced once a run completes."""
+        (tmp_path / "prompt.txt").write_text("Answer: {question}")
+        (tmp_path / "dataset.json").write_text(json.dumps(sample_dataset))
+        runner.prompts_dir = runner.datasets_dir = runner.results_dir = tmp_path
+        runner.response_cache_path = None
+        (tmp_path / "scores.ndjson").write_text('{"prompt_name": "previous.txt"}\n')
+        
+        async def fail(*args):
+            raise RuntimeError("API down")
+        
+        runner._evaluate_prompts = fail
+        with pytest.raises(RuntimeError):
+            runner.run_evaluation(["prompt.txt"], "dataset.json")
+        assert "previous.txt" in (tmp_path / "scores.ndjson").read_text()
+        
+        del runner._evaluate_prompts
+        runner.run_evaluation(["prompt.txt"], "dataset.json")
+        assert '"prompt.txt"' in (tmp_path / "scores.ndjson").read_text()
+        assert not (tmp_path / "scores.ndjson.tmp").exists()
+    
+    def test_worker_cache_entries_merge_into_parent(self, runner):
+        """Test cache entries added in a worker runner are merged by the parent."""
+        worker = EvaluationRunner()
+        worker.metrics_calc._stored_embeddings = {"old": 0}
+        runner.metrics_calc._stored_embeddings = {"old": 0}
+        before = worker._cache_keys()
+        
+        worker.metrics_calc._stored_embeddings["new"] = 1
+        worker._gen_cache.put("ns", "question", "answer")
+        worker.evaluator.judge_cache.put("judge", "question", {"accuracy": 1.0})
+        delta = worker._cache_delta(before)
+        runner._merge_cache_delta(delta)
+        
+        assert delta["embeddings"] == {"new": 1}
+        assert runner.metrics_calc._stored_embeddings == {"old": 0, "new": 1}
+        assert runner._gen_cache.get("ns", "question") == "answer"
+        assert runner.evaluator.judge_cache.get("judge", "question") == {"accuracy": 1.0}
+    
+    def test_mock_judge_reuses_reference_metrics(self, runner):
+        """Test demo-mode judge scores come from the reference metrics."""
+        if not runner._use_mock_judge:
+            pytest.skip("API key configured")
+        
+        test_case = {"question": "Q", "reference_answer": "Paris is the capital"}
+        runner.metrics_calc.semantic_similarity_batch = lambda preds, refs: [1.0000001]
+        test_results, buffer = runner._score_test_cases([(test_case, "Paris", None)])
+        scores = test_results[0]["scores"]
+        
+        assert scores["accuracy"] == scores["completeness"] == 1.0
+        assert scores["faithfulness"] == scores["f1_score"]
+        assert buffer.tolist() == [[scores[key] for key in SCORE_KEYS]]
+    
+    def test_judge_scores_fill_buffer_columns(self, runner):
+        """Test judge scores land in their SCORE_KEYS columns and in the result dicts."""
+        test_case = {"question": "Q", "reference_answer": "Paris"}
+        judge = {"accuracy": 0.9, "faithfulness": 0.8, "completeness": 0.7}
+        
+        test_results, buffer = runner._score_test_cases([(test_case, "Paris", judge)])
+        scores = test_results[0]["scores"]
+        
+        assert {key: scores[key] for key in judge} == judge
+        assert scores["exact_match"] == scores["f1_score"] == 1.0
+        assert buffer[0].tolist() == [scores[key] for key in SCORE_KEYS]
+    
+    def test_build_batch_jsonl(self, runner, tmp_path, sample_dataset):
+        """Test Batch API input has one request per prompt and test case."""
+        (tmp_path / "prompt.txt").write_text("Answer: {question}")
+        runner.prompts_dir = tmp_path
+        
+        payload = runner._build_batch_jsonl(["prompt.txt"], sample_dataset)
+        requests = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+        
+        assert [r["custom_id"] for r in requests] == ["prompt.txt|0", "prompt.txt|1"]
+        assert requests[0]["url"] == "/v1/chat/completions"
+        assert requests[0]["body"]["messages"][0]["content"] == (
+            "Answer: " + sample_dataset[0]["question"]
+        )
@@ -0,0 +1,263 @@
+"""
+Unit tests for the environment validator.
+"""
+
+import io
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import validate_env  # noqa: E402
+from validate_env import (  # noqa: E402
+    EnvironmentValidator,
+    _count_files,
+    _find_env_files,
+    _has,
+    _get_api_key,
+    _probe_environment,
+    validate_environment
+)
+
+
+class TestEnvironmentValidator:
+    """Test cases for EnvironmentValidator."""
+    
+    @pytest.fixture
+    def validator(self, tmp_path, monkeypatch):
+        """Create a validator instance with a fresh API key read and an empty probe cache."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        _get_api_key.cache_clear()
+        yield EnvironmentValidator()
+        _get_api_key.cache_clear()
+    
+    def test_check_dependencies_does_not_import(self, validator, monkeypatch):
+        """Test dependency probes locate packages without importing them."""
+        monkeypatch.delitem(sys.modules, "sentence_transformers", raising=False)
+        
+        validator.check_dependencies()
+        
+        assert "sentence_transformers" not in sys.modules
+        assert not validator.errors
+    
+    def test_check_dependencies_skips_openai_in_demo_mode(self, validator, monkeypatch):
+        """Test no OpenAI warning is raised when no API key is configured."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        
+        validator.check_dependencies()
+        
+        assert not any("openai" in warning for warning in validator.warnings)
+    
+    def test_missing_required_dependency_is_an_error(self, validator, monkeypatch):
+        """Test a missing error-level dependency is reported as an error."""
+        monkeypatch.setattr(
+            EnvironmentValidator, "_DEPS",
+            (("not_a_real_module_xyz", "error", "missing!"),)
+        )
+        
+        validator.check_dependencies()
+        
+        assert validator.errors == ["missing!"]
+    
+    def test_has_uses_imported_modules(self, monkeypatch):
+        """Test modules already in sys.modules are found without find_spec."""
+        def fail(name):
+            raise AssertionError(f"unexpected probe of {name}")
+        
+        monkeypatch.setattr(validate_env.importlib.util, "find_spec", fail)
+        
+        assert _has("sys")
+    
+    def _fake_dep(self, monkeypatch):
+        """Probe only a fake module that find_spec reports as installed."""
+        monkeypatch.setattr(
+            EnvironmentValidator, "_DEPS",
+            (("not_a_real_module_xyz", "error", "missing!"),)
+        )
+        monkeypatch.setattr(validate_env.importlib.util, "find_spec", lambda name: object())
+    
+    def _fail_probe(self, monkeypatch):
+        """Make any further find_spec call fail the test."""
+        def fail(name):
+            raise AssertionError(f"unexpected probe of {name}")
+        
+        monkeypatch.setattr(validate_env.importlib.util, "find_spec", fail)
+    
+    def test_check_dependencies_replays_cache(self, validator, monkeypatch):
+        """Test a second run replays found modules without calling find_spec."""
+        self._fake_dep(monkeypatch)
+        validator.check_dependencies()
+        
+        self._fail_probe(monkeypatch)
+        replayed = EnvironmentValidator()
+        replayed.check_dependencies()
+        
+        assert replayed._ok == ["dep:not_a_real_module_xyz"]
+        assert replayed.errors == []
+    
+    def test_check_dependencies_reprobes_missing_modules(self, validator, monkeypatch):
+        """Test a missing module is not cached, so a later install is picked up."""
+        monkeypatch.setattr(
+            EnvironmentValidator, "_DEPS",
+            (("not_a_real_module_xyz", "error", "missing!"),)
+        )
+        validator.check_dependencies()
+        assert validator.errors == ["missing!"]
+        
+        monkeypatch.setattr(validate_env.importlib.util, "find_spec", lambda name: object())
+        installed = EnvironmentValidator()
+        installed.check_dependencies()
+        
+        assert installed.errors == []
+        assert installed._ok == ["dep:not_a_real_module_xyz"]
+    
+    def test_check_dependencies_reprobes_on_key_change(self, validator, monkeypatch):
+        """Test a changed site-packages state invalidates the cached probe."""
+        self._fake_dep(monkeypatch)
+        validator.check_dependencies()
+        
+        monkeypatch.setattr(validate_env, "_site_packages_key", lambda: ["changed"])
+        monkeypatch.setattr(validate_env.importlib.util, "find_spec", lambda name: None)
+        reprobed = EnvironmentValidator()
+        reprobed.check_dependencies()
+        
+        assert reprobed.errors == ["missing!"]
+    
+    def test_check_dependencies_caches_only_found_modules(self, validator, monkeypatch):
+        """Test found modules are added to the cache and missing ones are not."""
+        validator.check_dependencies()
+        monkeypatch.setattr(
+            EnvironmentValidator, "_DEPS",
+            EnvironmentValidator._DEPS + (("not_a_real_module_xyz", "error", "missing!"),)
+        )
+        
+        extended = EnvironmentValidator()
+        extended.check_dependencies()
+        
+        assert extended.errors == ["missing!"]
+        cached = validate_env._read_cache(validate_env._cache_file("deps.json"))
+        assert "flask" in cached["found"]
+        assert "not_a_real_module_xyz" not in cached["found"]
+    
+    def test_check_dependencies_serves_stale_cache(self, validator, monkeypatch):
+        """Test the last cached result is used when the cache key cannot be computed."""
+        self._fake_dep(monkeypatch)
+        validator.check_dependencies()
+        
+        monkeypatch.setattr(validate_env, "_site_packages_key", lambda: None)
+        self._fail_probe(monkeypatch)
+        stale = EnvironmentValidator()
+        stale.check_dependencies()
+        
+        assert stale._ok == ["dep:not_a_real_module_xyz"]
+    
+    def test_api_key_read_is_cached(self, validator, monkeypatch):
+        """Test the API key is read once until the cache is cleared."""
+        monkeypatch.setenv("OPENAI_API_KEY", "first")
+        assert _get_api_key() == "first"
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "second")
+        assert _get_api_key() == "first"
+        
+        _get_api_key.cache_clear()
+        assert _get_api_key() == "second"
+    
+    def test_check_directories_creates_missing(self, validator, tmp_path, monkeypatch):
+        """Test missing directories are created and existing ones are left alone."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "prompts").mkdir()
+        
+        validator.check_directories()
+        
+        for dir_name in ("results", "prompts", "datasets"):
+            assert (tmp_path / dir_name).is_dir()
+    
+    def test_find_env_files_searches_from_cwd(self, tmp_path, monkeypatch):
+        """Test the .env in a parent of the working directory is found first."""
+        (tmp_path / ".env").write_text("OPENAI_API_KEY=from-project\n")
+        nested = tmp_path / "a" / "b"
+        nested.mkdir(parents=True)
+        monkeypatch.chdir(nested)
+        script_env = Path(validate_env.__file__).resolve().parent / ".env"
+        
+        found = _find_env_files()
+        
+        assert found[0] == str(tmp_path / ".env")
+        assert found[1:] == ([str(script_env)] if script_env.is_file() else [])
+    
+    def test_count_files(self, tmp_path):
+        """Test only regular files with the suffix are counted."""
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "b.txt").write_text("b")
+        (tmp_path / "c.json").write_text("{}")
+        (tmp_path / "dir.txt").mkdir()
+        
+        assert _count_files(str(tmp_path), ".txt") == 2
+        assert _count_files(str(tmp_path / "missing"), ".txt") == 0
+    
+    def test_run_checks_merges_in_order(self, validator, monkeypatch):
+        """Test concurrent check results are reported in _CHECKS order."""
+        for delay, name in enumerate(reversed(EnvironmentValidator._CHECKS)):
+            def check(self, name=name, delay=delay):
+                time.sleep(delay * 0.01)
+                self._ok.append(name)
+            monkeypatch.setattr(EnvironmentValidator, name, check)
+        
+        validator.run_checks()
+        
+        assert validator._ok == list(EnvironmentValidator._CHECKS)
+    
+    def test_validate_passes_in_repo(self, validator, monkeypatch):
+        """Test validation succeeds against the repository layout."""
+        monkeypatch.chdir(Path(__file__).parent.parent)
+        
+        assert validator.validate() is True
+    
+    def test_report_is_written_once_at_the_end(self, validator, monkeypatch, capsys):
+        """Test check output is buffered until validate writes the report."""
+        monkeypatch.chdir(Path(__file__).parent.parent)
+        
+        validator.check_prompts()
+        assert capsys.readouterr().out == ""
+        
+        validator.validate()
+        out = capsys.readouterr().out
+        assert out.count("ENVIRONMENT VALIDATION") == 1
+        assert "✅ OK: " in out
+        assert "prompts:" in out
+    
+    def test_report_falls_back_to_ascii_markers(self, validator, monkeypatch):
+        """Test emoji markers are replaced when stdout cannot encode them."""
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="cp1252")
+        monkeypatch.setattr(sys, "stdout", stdout)
+        validator.warnings.append("⚠️  Something to check")
+        
+        validator.report()
+        
+        stdout.seek(0)
+        out = stdout.read()
+        assert "[WARN]  Something to check" in out
+        assert "[OK] Environment validation passed with warnings." in out
+    
+    def test_validate_environment_probes_once(self, validator, monkeypatch, capsys):
+        """Test repeated validation reuses the first probe but still reports."""
+        monkeypatch.chdir(Path(__file__).parent.parent)
+        calls = []
+        original = EnvironmentValidator.run_checks
+        monkeypatch.setattr(
+            EnvironmentValidator, "run_checks",
+            lambda self: calls.append(1) or original(self)
+        )
+        _probe_environment.cache_clear()
+        
+        try:
+            assert validate_environment() is True
+            assert validate_environment() is True
+        finally:
+            _probe_environment.cache_clear()
+        
+        assert len(calls) == 1
+        assert capsys.readouterr().out.count("ENVIRONMENT VALIDATION") == 2
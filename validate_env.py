@@ -3,145 +3,368 @@ Environment configuration validator.
 Checks for required dependencies and configuration before running the app.
 """
 
+import io
 import sys
 import os
-from pathlib import Path
+import json
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Report banners, built once; each is emitted as a single buffered line
+_BAR = "=" * 70
+_VALIDATION_HEADER = f"\n{_BAR}\n   ENVIRONMENT VALIDATION\n{_BAR}\n"
+_WARNINGS_HEADER = f"\n{_BAR}\n   WARNINGS\n{_BAR}"
+_ERRORS_HEADER = f"\n{_BAR}\n   ERRORS\n{_BAR}"
+_FAILED_FOOTER = (
+    f"\n{_BAR}\n❌ Environment validation failed. Please fix the errors above.\n{_BAR}\n"
+)
+_PASSED_FOOTER = f"\n{_BAR}\n✅ Environment validation passed!\n{_BAR}\n"
+_PASSED_WITH_WARNINGS_FOOTER = (
+    f"\n{_BAR}\n✅ Environment validation passed with warnings.\n{_BAR}\n"
+)
+# Plain markers for consoles that cannot encode the emoji (e.g. Windows cp1252)
+_ASCII_MARKERS = str.maketrans({'✅': '[OK]', '⚠': '[WARN]', '\ufe0f': None, '❌': '[ERR]'})
+
+
+@lru_cache(maxsize=None)
+def _get_api_key():
+    """Read OPENAI_API_KEY once; call _get_api_key.cache_clear() to force a re-read."""
+    return os.getenv('OPENAI_API_KEY')
+
+
+def _find_env_files():
+    """
+    Locate .env files without importing dotenv.
+    
+    Returns:
+        The nearest .env from the working directory upward (as load_dotenv finds
+        it), then the one next to this script, skipping missing and duplicate files
+    """
+    found = []
+    directory = os.getcwd()
+    while True:
+        candidate = os.path.join(directory, '.env')
+        if os.path.isfile(candidate):
+            found.append(candidate)
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    
+    script_env = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+    if script_env not in found and os.path.isfile(script_env):
+        found.append(script_env)
+    return found
+
+
+def _count_files(dir_name, suffix):
+    """Count regular files in dir_name ending with suffix (0 if the directory is missing)."""
+    try:
+        with os.scandir(dir_name) as entries:
+            # DirEntry.is_file uses the cached d_type, so no per-file stat
+            return sum(
+                1 for entry in entries
+                if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False)
+            )
+    except FileNotFoundError:
+        return 0
+
+
+def _has(name):
+    """
+    Check whether a module can be imported, without importing it.
+    
+    Modules already imported elsewhere in the process (e.g. by the web app) are a
+    sys.modules lookup; anything else is located with find_spec.
+    """
+    return sys.modules.get(name) is not None or importlib.util.find_spec(name) is not None
+
+
+def _cache_file(name):
+    """Path of a probe cache file under $XDG_CACHE_HOME (default ~/.cache)/prompt_eval_lab."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(cache_home, 'prompt_eval_lab', name)
+
+
+def _site_packages_key():
+    """
+    Identify the interpreter and its installed packages.
+    
+    Installing or removing a package touches its site directory, which bumps the
+    directory's mtime and invalidates anything cached under this key. Every global
+    site dir (e.g. Debian's dist-packages) and the user site are included.
+    
+    Returns:
+        [python version, executable, site dir mtimes], or None if they cannot be read
+    """
+    import site
+    try:
+        site_dirs = site.getsitepackages() + [site.getusersitepackages()]
+    except AttributeError:
+        # virtualenv's legacy site.py has no getsitepackages
+        return None
+    mtimes = []
+    for site_dir in site_dirs:
+        try:
+            mtimes.append(os.path.getmtime(site_dir))
+        except FileNotFoundError:
+            # The user site usually does not exist until the first --user install
+            mtimes.append(None)
+        except OSError:
+            return None
+    return [sys.version, sys.executable, mtimes]
+
+
+def _read_cache(path):
+    """Load a JSON cache file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, data):
+    """Atomically replace a JSON cache file; failures only cost the next run a live probe."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
 
 
 class EnvironmentValidator:
     """Validates environment setup and configuration."""
     
+    # (module, level if missing, message if missing)
+    _DEPS = (
+        (
+            'openai', 'warn',
+            "⚠️  'openai' library not installed. Install with: pip install openai\n"
+            "   Demo mode will work without it."
+        ),
+        (
+            'flask', 'error',
+            "❌ Flask is required for web UI. Install with: pip install flask"
+        ),
+        (
+            'sentence_transformers', 'warn',
+            "⚠️  'sentence-transformers' not installed. Some metrics unavailable.\n"
+            "   Install with: pip install sentence-transformers"
+        ),
+    )
+    
     def __init__(self):
         self.warnings = []
         self.errors = []
+        # Short labels of passed checks, reported on one summary line
+        self._ok = []
+        # Report lines are buffered and written to stdout in one call by validate()
+        self._out = io.StringIO()
+    
+    def _emit(self, line=""):
+        """Append a line to the buffered report."""
+        self._out.write(line)
+        self._out.write("\n")
+    
+    def _flush(self):
+        """Write the buffered report to stdout in a single call and reset the buffer."""
+        report = self._out.getvalue()
+        encoding = (getattr(sys.stdout, 'encoding', None) or '').lower()
+        if not encoding.startswith('utf'):
+            report = report.translate(_ASCII_MARKERS)
+        sys.stdout.write(report)
+        sys.stdout.flush()
+        self._out = io.StringIO()
     
     def check_api_key(self):
         """Check if OpenAI API key is configured."""
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = _get_api_key()
         if not api_key:
             self.warnings.append(
                 "⚠️  No OPENAI_API_KEY found. Running in DEMO MODE with heuristic evaluation.\n"
                 "   To use real LLM evaluation, add your API key to .env file."
             )
         else:
-            print("✅ OpenAI API key configured")
+            self._ok.append("api_key")
     
     def check_directories(self):
         """Ensure required directories exist."""
         required_dirs = ['results', 'prompts', 'datasets']
         for dir_name in required_dirs:
-            dir_path = Path(dir_name)
-            if not dir_path.exists():
-                dir_path.mkdir(parents=True, exist_ok=True)
-                print(f"✅ Created missing directory: {dir_name}/")
-            else:
-                print(f"✅ Directory exists: {dir_name}/")
+            # One mkdir call; an existing directory is the common case
+            try:
+                os.makedirs(dir_name)
+            except FileExistsError:
+                continue
+            self._ok.append(f"created:{dir_name}/")
     
     def check_dependencies(self):
-        """Check if optional dependencies are available."""
-        try:
-            import openai
-            print("✅ OpenAI library available")
-        except ImportError:
-            self.warnings.append(
-                "⚠️  'openai' library not installed. Install with: pip install openai\n"
-                "   Demo mode will work without it."
-            )
+        """
+        Check if optional dependencies are available.
         
-        try:
-            import flask
-            print("✅ Flask installed")
-        except ImportError:
-            self.errors.append(
-                "❌ Flask is required for web UI. Install with: pip install flask"
-            )
+        Availability is looked up with _has, so packages are located without being
+        imported (sentence-transformers would otherwise pull in torch). Modules that
+        were found are cached in deps.json, keyed by the interpreter and site dirs,
+        so later runs skip their lookups; if the key cannot be computed, the last
+        cached results are served as-is. Missing modules are never cached, so an
+        install anywhere on sys.path is picked up by the next run.
+        """
+        key = _site_packages_key()
+        cache_path = _cache_file('deps.json')
+        cached = _read_cache(cache_path)
+        found = set()
+        if isinstance(cached, dict) and (key is None or cached.get('key') == key):
+            if isinstance(cached.get('found'), list):
+                found = set(cached['found'])
         
-        try:
-            from sentence_transformers import SentenceTransformer
-            print("✅ Sentence-transformers available")
-        except ImportError:
-            self.warnings.append(
-                "⚠️  'sentence-transformers' not installed. Some metrics unavailable.\n"
-                "   Install with: pip install sentence-transformers"
-            )
+        newly_found = False
+        for module, level, missing in self._DEPS:
+            # The OpenAI SDK is only used with an API key, so demo mode skips the probe
+            if module == 'openai' and not _get_api_key():
+                continue
+            if module not in found and _has(module):
+                found.add(module)
+                newly_found = True
+            if module in found:
+                self._ok.append(f"dep:{module}")
+            elif level == 'error':
+                self.errors.append(missing)
+            else:
+                self.warnings.append(missing)
+        
+        if newly_found and key is not None:
+            _write_cache(cache_path, {'key': key, 'found': sorted(found)})
     
     def check_prompts(self):
         """Verify prompt files exist."""
-        prompts_dir = Path('prompts')
-        prompt_files = list(prompts_dir.glob('*.txt'))
-        if not prompt_files:
+        prompt_count = _count_files('prompts', '.txt')
+        if not prompt_count:
             self.warnings.append(
                 "⚠️  No prompt files found in prompts/ directory"
             )
         else:
-            print(f"✅ Found {len(prompt_files)} prompt file(s)")
+            self._ok.append(f"prompts:{prompt_count}")
     
     def check_datasets(self):
         """Verify dataset files exist."""
-        datasets_dir = Path('datasets')
-        dataset_files = list(datasets_dir.glob('*.json'))
-        if not dataset_files:
+        dataset_count = _count_files('datasets', '.json')
+        if not dataset_count:
             self.errors.append(
                 "❌ No dataset files found in datasets/ directory"
             )
         else:
-            print(f"✅ Found {len(dataset_files)} dataset file(s)")
+            self._ok.append(f"datasets:{dataset_count}")
+    
+    # Independent checks, in report order
+    _CHECKS = (
+        'check_directories',
+        'check_api_key',
+        'check_dependencies',
+        'check_prompts',
+        'check_datasets',
+    )
+    
+    def run_checks(self):
+        """
+        Run all checks, collecting results without reporting them.
+        
+        The checks are filesystem- and import-bound, so they run concurrently,
+        each on its own validator; results are merged in _CHECKS order so the
+        report does not depend on thread scheduling.
+        """
+        parts = [type(self)() for _ in self._CHECKS]
+        with ThreadPoolExecutor(max_workers=len(self._CHECKS)) as pool:
+            # list() waits for every check and re-raises the first failure
+            list(pool.map(lambda part, name: getattr(part, name)(), parts, self._CHECKS))
+        
+        for part in parts:
+            self._ok.extend(part._ok)
+            self.warnings.extend(part.warnings)
+            self.errors.extend(part.errors)
     
     def validate(self):
         """Run all validation checks."""
-        print("\n" + "="*70)
-        print("   ENVIRONMENT VALIDATION")
-        print("="*70 + "\n")
+        self.run_checks()
+        return self.report()
+    
+    def report(self):
+        """Write the collected results to stdout and return success status."""
+        self._emit(_VALIDATION_HEADER)
         
-        self.check_directories()
-        self.check_api_key()
-        self.check_dependencies()
-        self.check_prompts()
-        self.check_datasets()
+        if self._ok:
+            self._emit("✅ OK: " + ", ".join(self._ok))
         
-        # Print warnings
+        # Report warnings
         if self.warnings:
-            print("\n" + "="*70)
-            print("   WARNINGS")
-            print("="*70)
+            self._emit(_WARNINGS_HEADER)
             for warning in self.warnings:
-                print(f"\n{warning}")
+                self._emit(f"\n{warning}")
         
-        # Print errors
+        # Report errors
         if self.errors:
-            print("\n" + "="*70)
-            print("   ERRORS")
-            print("="*70)
+            self._emit(_ERRORS_HEADER)
             for error in self.errors:
-                print(f"\n{error}")
-            print("\n" + "="*70)
-            print("❌ Environment validation failed. Please fix the errors above.")
-            print("="*70 + "\n")
+                self._emit(f"\n{error}")
+            self._emit(_FAILED_FOOTER)
+            self._flush()
             return False
         
         if not self.warnings:
-            print("\n" + "="*70)
-            print("✅ Environment validation passed!")
+            self._emit(_PASSED_FOOTER)
         else:
-            print("\n" + "="*70)
-            print("✅ Environment validation passed with warnings.")
-        print("="*70 + "\n")
+            self._emit(_PASSED_WITH_WARNINGS_FOOTER)
+        self._flush()
         return True
 
 
+@lru_cache(maxsize=1)
+def _probe_environment():
+    """
+    Run all checks once per process; the environment does not change while running.
+    
+    Call _probe_environment.cache_clear() to force a fresh probe.
+    
+    Returns:
+        Tuple of (passed check labels, warnings, errors)
+    """
+    validator = EnvironmentValidator()
+    validator.run_checks()
+    return tuple(validator._ok), tuple(validator.warnings), tuple(validator.errors)
+
+
 def validate_environment():
     """Run environment validation and return success status."""
     validator = EnvironmentValidator()
-    return validator.validate()
+    ok, warnings, errors = _probe_environment()
+    validator._ok, validator.warnings, validator.errors = list(ok), list(warnings), list(errors)
+    return validator.report()
 
 
 if __name__ == '__main__':
-    # Load .env if available
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-    except ImportError:
-        pass
+    # Load .env if available; skip the dotenv import entirely when there is none
+    env_files = _find_env_files()
+    if env_files:
+        try:
+            from dotenv import load_dotenv
+            # Existing variables are not overridden, so the first file wins
+            for env_file in env_files:
+                load_dotenv(env_file)
+        except ImportError:
+            pass
     
     success = validate_environment()
-    sys.exit(0 if success else 1)
+    status = 0 if success else 1
+    # As a CI gate, os._exit returns sooner by skipping interpreter finalization.
+    # It also skips atexit handlers and unflushed output, so flush first, and fall
+    # back to sys.exit if torch was imported, since its atexit hooks must still run.
+    if 'torch' in sys.modules:
+        sys.exit(status)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(status)
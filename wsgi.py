@@ -0,0 +1,14 @@
+"""
+WSGI entrypoint for serving the dashboard with gunicorn and gevent workers.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+# Patch blocking I/O before anything imports openai/httpx so judge and
+# generation calls yield to other requests instead of blocking the worker
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402,F401